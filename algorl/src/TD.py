@@ -1,18 +1,10 @@
-# Standard Libraries
-import sys
-from pathlib import Path
-
 # Third party libraries
-import random
 import pandas as pd
 import numpy as np
-from icecream import ic
-import matplotlib.pyplot as plt
 
 # Local imports
 from ..logs import logging
-from .tool_box import create_directory, RLFunctions
-from matplotlib.table import Table
+from .tool_box import RLFunctions, njit
 
 # 1. Monte Carlo Prediction to estimate state-action values
 # 2. On-policy first-visit Monte Carlo Control algorithm
@@ -21,82 +13,159 @@ from matplotlib.table import Table
 # Source:
 # https://people.cs.umass.edu/~barto/courses/cs687/Chapter%205.pdf
 
+@njit(inline='always')
+def _sarsa_update(Q, state, action, reward, next_state, next_action, alpha, gamma):
+    '''Q(S, A) <- Q(S, A) + alpha[R + gamma * Q(S', A') - Q(S, A)]'''
+    Q[state, action] += alpha * (reward + gamma * Q[next_state, next_action] - Q[state, action])
+
+@njit(inline='always')
+def _qlearn_update(Q, state, action, reward, next_state, alpha, gamma):
+    '''Q(S, A) <- Q(S, A) + alpha[R + gamma * max[Q(S', a)] - Q(S, A)]'''
+    Q[state, action] += alpha * (reward + gamma * Q[next_state].max() - Q[state, action])
+
+@njit(cache=True)
+def _epsilon_greedy(q_row, explore, rand_a, t):
+    '''Index of the pre-drawn random action if the t-th roll explores, otherwise of the greedy one'''
+    if explore[t]:
+        return rand_a[t]
+    return np.argmax(q_row)
+
+@njit(cache=True)
+def _sarsa_episode(Q, T, R, is_terminal, state, alpha, gamma, max_steps, explore, rand_a, t):
+    '''
+    Runs a Sarsa episode from state on the tabulated environment reading the exploration
+    rolls from position t, returns the number of steps and the position of the next unused roll
+    '''
+    action = _epsilon_greedy(Q[state], explore, rand_a, t)
+    t += 1
+    num_of_steps = 0
+    while not is_terminal[state] and num_of_steps < max_steps:
+        next_state = T[state, action]
+        next_action = _epsilon_greedy(Q[next_state], explore, rand_a, t)
+        t += 1
+        reward = R[next_state]
+        _sarsa_update(Q, state, action, reward, next_state, next_action, alpha, gamma)
+        state = next_state
+        action = next_action
+        num_of_steps += 1
+    return num_of_steps, t
+
+@njit(cache=True)
+def _qlearn_episode(Q, T, R, is_terminal, state, alpha, gamma, max_steps, explore, rand_a, t):
+    '''
+    Runs a Q-learning episode from state on the tabulated environment reading the exploration
+    rolls from position t, returns the number of steps and the position of the next unused roll
+    '''
+    num_of_steps = 0
+    while not is_terminal[state] and num_of_steps < max_steps:
+        action = _epsilon_greedy(Q[state], explore, rand_a, t)
+        t += 1
+        next_state = T[state, action]
+        reward = R[next_state]
+        _qlearn_update(Q, state, action, reward, next_state, alpha, gamma)
+        state = next_state
+        num_of_steps += 1
+    return num_of_steps, t
+
 class TemporalDifferenceFunctions(RLFunctions):
     """
     """
-    def __init__(self) -> None:
+    def __init__(self, seed:int = None) -> None:
         self.logger = logging.getLogger(__name__)
         RLFunctions.__init__(self)
+        self._rng = np.random.default_rng(seed)
 
-    def sarsa_formula(self, q_values_df, state, action, reward, next_state, next_action):
-        '''Q(S, A) <- Q(S, A) + alpha[R + gamma * Q(S', A') - Q(S, A)]'''
-        # Q[state][action] = Q[state][action] + alpha * reward + gamma * Q[next_state][next_action] - Q[state][action]
-        q_values_df.at[state, action] =\
-            q_values_df.at[state, action] + self.alpha *\
-                (reward + self.gamma * q_values_df.at[next_state, next_action] \
-                    - q_values_df.at[state, action])
-        return q_values_df
-
-    def q_learning_formula(self, q_values_df, state, action, reward, next_state, _):
-        '''Q(S, A) <- Q(S, A) + alpha[R + gamma * max[Q(S', a)] - Q(S, A)]'''
-        # Q[state][action] = Q[state][action] + alpha * reward + gamma * Q[next_state].max() - Q[state][action]
-        max_value = max(q_values_df.at[next_state, x] for x in self.env.possible_actions)
-        q_values_df.at[state, action] =\
-            q_values_df.at[state, action] + self.alpha *\
-                (reward+ self.gamma * max_value - q_values_df.at[state, action])
-        return q_values_df
-
-    def select_action(self, state, Q):
+    def select_action(self, q_row):
         '''
-        Selects an action given a state
+        Selects the index of an action given the action values of a state
         '''
-        if np.random.rand() < self.epsilon:
-            return self.get_random_action(state)
+        if self._rng.random() < self.epsilon:
+            return int(self._rng.integers(self._n_actions))
         else:
-            return self.env.possible_actions[np.argmax(Q.loc[state, :])]
+            return int(q_row.argmax())
 
     def get_q_df(self):
-        # Initialize Q(s,a)
-        return pd.DataFrame( 0, columns=self.env.possible_actions, index=pd.MultiIndex.from_tuples(self.env.all_states), dtype=float)
-
-    def td_control(self, algo, plot_name:str):
-        # Initialize Q(s,a)
-        q_values_df = self.get_q_df()
+        '''Initialize Q(s,a) as a (states x actions) float32 array, precise enough for the TD targets'''
+        return np.zeros((len(self.env.all_states), len(self.env.possible_actions)), dtype=np.float32)
+
+    def q_to_df(self, Q):
+        '''Wrap the Q array in a DataFrame indexed by state and action, used for plotting'''
+        # The labels are built on first use and shared by every later DataFrame
+        if not hasattr(self, '_q_index'):
+            self._q_cols = list(self.env.possible_actions)
+            self._q_index = pd.MultiIndex.from_tuples(self.env.all_states)
+        return pd.DataFrame(Q, columns=self._q_cols, index=self._q_index)
+
+    def _build_tables(self):
+        '''
+        Tabulate the environment by state and action indices, once per run:
+        - _T: the next state of each state-action pair, int16 unless the grid has too many states
+        - _R: the float32 reward of moving into each state
+        - _term: which states are terminal
+        - _available_state_idx: the states an episode can start from
+        together with the lookups from states and actions to their indices and the
+        number of actions used in the step loops
+        '''
+        # State indices double as flat indices of the grid, which TD0 and NStepTD update through a view
+        if not self.env.grid.flags.c_contiguous or self.env.all_states != list(np.ndindex(self.env.grid.shape)):
+            raise ValueError('The grid has to be C-contiguous with the states in its row-major order')
+        self._state_idx = {state: idx for idx, state in enumerate(self.env.all_states)}
+        self._n_actions = len(self.env.possible_actions)
+        self._action_idx = {action: idx for idx, action in enumerate(self.env.possible_actions)}
+
+        state_dtype = np.int16 if len(self.env.all_states) <= np.iinfo(np.int16).max else np.int64
+        self._T = np.zeros((len(self.env.all_states), self._n_actions), dtype=state_dtype)
+        for state, state_idx in self._state_idx.items():
+            for action, action_idx in self._action_idx.items():
+                self._T[state_idx, action_idx] = self._state_idx[self.env.next_state_given_action(state, action)]
+        self._R = np.array([self.env.grid[state] for state in self.env.all_states], dtype=np.float32)
+        self._term = np.array([self.env.is_terminal_state(state) for state in self.env.all_states], dtype=np.bool_)
+        self._available_state_idx = np.array([self._state_idx[state] for state in self.env.available_states], dtype=np.int64)
+
+    def get_start_state(self):
+        '''Index of the starting state, or of a random available state if there is none'''
+        if self.starting_state is None:
+            return self._available_state_idx[self._rng.integers(len(self._available_state_idx))]
+        return self._state_idx[self.starting_state]
+
+    def _draw_exploration(self):
+        '''
+        Refill the exploration buffers: whether each step explores and the random action it takes
+        '''
+        self._rng.random(out=self._rolls)
+        np.less(self._rolls, self.epsilon, out=self._explore)
+        self._rand_a[:] = self._rng.integers(self._n_actions, size=len(self._rand_a))
 
+    def td_control(self, episode, plot_name:str):
+        '''Runs the episode function over the tabulated environment for each epoch'''
+        self._build_tables()
         # Initialize Q(s,a), for all s element of S+, a element of A(s), arbitrarily except that Q(terminal,·) = 0
-        state_action_pairs = {state:self.get_random_action() for state in self.env.all_states}
-        # Initialize actions using epsilon greedy and value state of the greed         
-        for x, y in state_action_pairs.items():
-            state_action_pairs[x] = self.epsilon_greedy(y)
+        Q = self.get_q_df()
+
+        # An episode reads at most num_episodes + 1 exploration rolls, the buffers hold two
+        # episodes worth and are only refilled when the unused rolls may not cover the next one
+        episode_draws = self.num_episodes + 1
+        self._rolls = np.empty(2 * episode_draws, dtype=np.float64)
+        self._explore = np.empty(2 * episode_draws, dtype=np.bool_)
+        self._rand_a = np.empty(2 * episode_draws, dtype=np.int64)
+        t = len(self._explore)
 
         # Loop for each episode:
         for epoch in range(self.num_of_epochs):
             if epoch % 100 == 0:
                 self.logger.info(f'\tEpoch {epoch}')
 
-            # Get first state and action for the episode
-            state = random.choice(self.env.available_states) if self.starting_state is None else self.starting_state
-            action = state_action_pairs[state]
-
-            # Loop for each step of the episode:
-            num_of_steps = 0
-            while not self.env.is_terminal_state(state) and num_of_steps < self.num_episodes:
-                # Generate trajectory
-                next_state = self.env.new_state_given_action(state, action)
-                next_action = self.epsilon_greedy(state_action_pairs[next_state])
-                reward = self.env.grid[next_state]
-
-                # Compute the pair state-actions
-                q_values_df = algo(q_values_df, state, action, reward, next_state, next_action)
-
-                self.logger.debug(f'S: {state}, A: {action}, R:{q_values_df.at[state, action]:.3f}, S: {next_state}, A: {next_action}')
-                state_action_pairs[next_state] = next_action
-                state = next_state
-                action = next_action
+            if len(self._explore) - t < episode_draws:
+                self._draw_exploration()
+                t = 0
 
-                num_of_steps += 1
+            # Loop for each step of the episode
+            num_of_steps, t = episode(
+                Q, self._T, self._R, self._term, self.get_start_state(), 
+                self.alpha, self.gamma, self.num_episodes, self._explore, self._rand_a, t)
+            self.logger.debug(f'num of steps: {num_of_steps}')
 
-        self.drew_policy(q_values_df, plot_name=plot_name)
+        self.drew_policy(self.q_to_df(Q), plot_name=plot_name)
 
 
 class TabularTD0(TemporalDifferenceFunctions):
@@ -119,14 +188,15 @@ class TabularTD0(TemporalDifferenceFunctions):
     '''
     def __init__(
         self, env, alpha:float = 0.5, gamma:float = 0.9, starting_state=(2,0),
-        num_of_epochs:int = 1_00, plot_name='TD0', reward = -1):
+        num_of_epochs:int = 1_00, plot_name='TD0', reward = -1, seed:int = None):
         """
         Initializes the grid world
         - env: grid_environment: A tabular environment created by Make class
         - discount_factor: float: discount factor
         - num_of_epochs: int: number of epochs 
+        - seed: int: seed of the random number generator
         """
-        super().__init__()
+        super().__init__(seed)
         self.num_of_epochs = num_of_epochs
         self.gamma = gamma
         self.alpha = alpha
@@ -138,21 +208,24 @@ class TabularTD0(TemporalDifferenceFunctions):
 
     def compute_state_value(self):
         self.logger.info('Compute TD0')
+        self._build_tables()
+        # State values by state index, a view on the grid (its layout is checked in _build_tables)
+        V = self.env.grid.reshape(-1)
         for epoch in range(self.num_of_epochs):
             if epoch % (self.num_of_epochs/10) == 0:
                 self.logger.info(f'\tEpoch {epoch}')
 
-            state = self.starting_state
+            state = self.get_start_state()
             done = False
             while not done:
-                action = self.get_random_action()
-                next_state = self.env.new_state_given_action(state, action)
+                action = self._rng.integers(self._n_actions)
+                next_state = self._T[state, action]
                 self.logger.debug(f'state: {state}, action: {action}, new state: {next_state}')
                 # V[state] = V[state] + alphas * reward + gamma * V[next_state] * (not done) - V[state]
-                self.env.grid[state] = self.env.grid[state] +\
-                    self.alpha * (self.reward + self.gamma * self.env.grid[next_state] * (not done) - self.env.grid[state])
+                V[state] = V[state] +\
+                    self.alpha * (self.reward + self.gamma * V[next_state] * (not done) - V[state])
                 state = next_state
-                done = self.env.is_terminal_state(state)
+                done = self._term[state]
 
 
 class Sarsa(TemporalDifferenceFunctions):
@@ -177,14 +250,15 @@ class Sarsa(TemporalDifferenceFunctions):
     def __init__(
         self, env, alpha:float = 0.5, gamma:float = 0.9,  starting_state=(2,0), 
         num_of_epochs:int = 1_000, num_episodes =10_000, epsilon = 0.1,
-        plot_name='Sarsa', reward = -1):
+        plot_name='Sarsa', reward = -1, seed:int = None):
         """
         Initializes the grid world
         - env: grid_environment: A tabular environment created by Make class
         - discount_factor: float: discount factor
         - num_of_epochs: int: number of epochs 
+        - seed: int: seed of the random number generator
         """
-        super().__init__()
+        super().__init__(seed)
         self.num_of_epochs = num_of_epochs
         self.gamma = gamma
         self.alpha = alpha
@@ -198,7 +272,7 @@ class Sarsa(TemporalDifferenceFunctions):
 
     def compute_state_value(self, plot_name='SARSA'):
         self.logger.info('Compute SARSA')
-        self.td_control(algo = self.sarsa_formula, plot_name=plot_name)
+        self.td_control(episode = _sarsa_episode, plot_name=plot_name)
 
 
 class QLearning(TemporalDifferenceFunctions):
@@ -223,14 +297,15 @@ class QLearning(TemporalDifferenceFunctions):
     def __init__(
         self, env, alpha:float = 0.5, gamma:float = 0.9,  starting_state=(2,0), 
         num_of_epochs:int = 1_000, num_episodes =10_000, epsilon = 0.1,
-        plot_name='Qlearning', reward = -1):
+        plot_name='Qlearning', reward = -1, seed:int = None):
         """
         Initializes the grid world
         - env: grid_environment: A tabular environment created by Make class
         - discount_factor: float: discount factor
         - num_of_epochs: int: number of epochs 
+        - seed: int: seed of the random number generator
         """
-        super().__init__()
+        super().__init__(seed)
         self.num_of_epochs = num_of_epochs
         self.gamma = gamma
         self.alpha = alpha
@@ -244,7 +319,7 @@ class QLearning(TemporalDifferenceFunctions):
 
     def compute_state_value(self, plot_name='QLearning'):
         self.logger.info('Compute Q-Learning')
-        self.td_control(algo = self.q_learning_formula, plot_name=plot_name)
+        self.td_control(episode = _qlearn_episode, plot_name=plot_name)
 
 
 class NStepTD(TemporalDifferenceFunctions):
@@ -256,14 +331,15 @@ class NStepTD(TemporalDifferenceFunctions):
     '''
     def __init__(
         self, env, alpha:float = 0.5, gamma:float = 0.9, starting_state:tuple=None,
-        num_of_epochs:int = 1_00, plot_name='TD0', step_cost = -1, n_step = 1):
+        num_of_epochs:int = 1_00, plot_name='TD0', step_cost = -1, n_step = 1, seed:int = None):
         """
         Initializes the grid world
         - env: grid_environment: A tabular environment created by Make class
         - discount_factor: float: discount factor
         - num_of_epochs: int: number of epochs 
+        - seed: int: seed of the random number generator
         """
-        super().__init__()
+        super().__init__(seed)
         self.num_of_epochs = num_of_epochs
         self.gamma = gamma
         self.alpha = alpha
@@ -272,12 +348,21 @@ class NStepTD(TemporalDifferenceFunctions):
         self.plot_name = plot_name
         self.step_cost = step_cost
         self.n_step = n_step
+        # gamma^0, ..., gamma^(n-1) to discount the rewards of the n steps
+        self._gammas = self.gamma ** np.arange(self.n_step)
         self.logger.info('NStepTD initialized')
 
+    def discounted_return(self, rewards, r, end):
+        '''G = sum_{i=r}^{end-1} gamma^(i-r) * R_{i+1}, the discounted rewards of the steps r to end'''
+        return float(self._gammas[:end - r] @ np.asarray(rewards[r:end]))
+
     def compute_state_value(self):
         '''Too formulaic, it needs to be refactored''' # TODO
         self.logger.info('Compute NStepTD')
         self.logger.info(f'n: {self.n_step}')
+        self._build_tables()
+        # State values by state index, a view on the grid (its layout is checked in _build_tables)
+        V = self.env.grid.reshape(-1)
         for epoch in range(self.num_of_epochs):
             if epoch % (self.num_of_epochs/10) == 0:
                 self.logger.info(f'\tEpoch {epoch}')
@@ -285,30 +370,35 @@ class NStepTD(TemporalDifferenceFunctions):
             T = 100_000 # It's the last time step of the episode
             t = 0
             states, rewards = [], []
-            state = self.starting_state
+            # Indices of the random actions of the episode, more are drawn if it gets longer
+            actions = self._rng.integers(self._n_actions, size=1_000)
+            state = self.get_start_state()
             done = False
             while not done:
                 if t < T:
-                    action = self.get_random_action()
+                    if t == len(actions):
+                        actions = np.concatenate(
+                            (actions, self._rng.integers(self._n_actions, size=len(actions))))
+                    action = actions[t]
                     self.logger.debug(f'State: {state}, Action: {action}')
-                    next_state = self.env.new_state_given_action(state, action)
+                    next_state = self._T[state, action]
                     self.logger.debug(f'Next State: {next_state}')
-                    reward = self.env.grid[next_state] + self.step_cost 
+                    reward = V[next_state] + self.step_cost 
                     states.append(state)
                     rewards.append(reward)
-                    if self.env.is_terminal_state(state):
+                    if self._term[state]:
                         T = t + 1 
                         done = True
 
                 r = t - self.n_step + 1
                 if r >= 0:
-                    G = sum(rewards[x] * self.gamma**(r-x) for x in range(r, np.min([r+self.n_step, T])))
+                    end = min(r + self.n_step, T)
+                    G = self.discounted_return(rewards, r, end)
                     if r + self.n_step < T:
-                        G += self.gamma**(self.n_step) * self.env.grid[states[r+self.n_step-1]]
+                        G += self.gamma**(self.n_step) * V[states[r+self.n_step-1]]
 
-                    if not self.env.is_terminal_state(state):
-                        self.env.grid[states[r]] = self.env.grid[states[r]] + self.alpha *\
-                            (G - self.env.grid[states[r]])
+                    if not self._term[state]:
+                        V[states[r]] = V[states[r]] + self.alpha * (G - V[states[r]])
 
                 if r == (T - 1):
                     done = True
@@ -328,14 +418,15 @@ class DoubleQLearning(TemporalDifferenceFunctions):
     def __init__(
         self, env, alpha:float = 0.5, gamma:float = 0.9,  starting_state=(2,0), 
         num_of_epochs:int = 1_000, num_episodes =10_000, epsilon = 0.1,
-        plot_name='D-QL', reward = -1):
+        plot_name='D-QL', reward = -1, seed:int = None):
         """
         Initializes the grid world
         - env: grid_environment: A tabular environment created by Make class
         - discount_factor: float: discount factor
         - num_of_epochs: int: number of epochs 
+        - seed: int: seed of the random number generator
         """
-        super().__init__()
+        super().__init__(seed)
         self.num_of_epochs = num_of_epochs
         self.gamma = gamma
         self.alpha = alpha
@@ -351,6 +442,7 @@ class DoubleQLearning(TemporalDifferenceFunctions):
     def compute_state_value(self, plot_name='DoubleQLearning'):
         self.logger.info('Compute Double Q-Learning')
         # self.td_control(algo = self.q_learning_formula, plot_name=plot_name)
+        self._build_tables()
         # Initialize Q(s,a)
         Q1 = self.get_q_df()
         Q2 = self.get_q_df()
@@ -361,39 +453,38 @@ class DoubleQLearning(TemporalDifferenceFunctions):
                 self.logger.info(f'\tEpoch {epoch}')
 
             # Get first state and action for the episode
-            state = random.choice(self.env.available_states) if self.starting_state is None else self.starting_state
-            action = self.select_action(state, (Q1 + Q2)/2)
+            state = self.get_start_state()
+            # argmax of (Q1 + Q2)/2 is the argmax of Q1 + Q2, only the row of the state is needed
+            action = self.select_action(Q1[state] + Q2[state])
 
             # Loop for each step of the episode:
             num_of_steps = 0
-            while not self.env.is_terminal_state(state) and num_of_steps < self.num_episodes:
+            while not self._term[state] and num_of_steps < self.num_episodes:
                 # Generate trajectory
-                next_state = self.env.next_state_given_action(state, action)
-                next_action = self.select_action(next_state, (Q1 + Q2)/2)
-                reward = self.env.grid[next_state]
+                next_state = self._T[state, action]
+                next_action = self.select_action(Q1[next_state] + Q2[next_state])
+                reward = self._R[next_state]
 
                 # Compute the pair state-actions
-                if np.random.randint(2):
-                    best_action = self.env.possible_actions[np.argmax(Q1.loc[state, :])]
-                    td_target = reward + self.gamma * Q2.at[next_state, best_action]
-                    td_error = td_target - Q1.at[state, action]
-                    Q1.at[state, action] = Q1.at[state, action] + self.alpha * td_error
+                if self._rng.integers(2):
+                    best_action = int(Q1[state].argmax())
+                    td_target = reward + self.gamma * Q2[next_state, best_action]
+                    td_error = td_target - Q1[state, action]
+                    Q1[state, action] += self.alpha * td_error
                     ''' From B&S
-                    best_action = self.env.possible_actions[np.argmax(Q1.loc[next_state, :])]
-                    Q1.at[state, action] =\
-                        Q1.at[state, action] + self.alpha *\
-                            (reward + self.gamma * Q2.at[next_state, best_action] - Q1.at[state, action])
+                    best_action = int(Q1[next_state].argmax())
+                    Q1[state, action] += self.alpha *\
+                        (reward + self.gamma * Q2[next_state, best_action] - Q1[state, action])
                     '''
                 else:
-                    best_action = self.env.possible_actions[np.argmax(Q2.loc[state, :])]
-                    td_target = reward + self.gamma * Q1.at[next_state, best_action]
-                    td_error = td_target - Q2.at[state, action]
-                    Q2.at[state, action] = Q2.at[state, action] + self.alpha * td_error
+                    best_action = int(Q2[state].argmax())
+                    td_target = reward + self.gamma * Q1[next_state, best_action]
+                    td_error = td_target - Q2[state, action]
+                    Q2[state, action] += self.alpha * td_error
                     ''' # From B&S
-                    best_action = self.env.possible_actions[np.argmax(Q2.loc[next_state, :])]
-                    Q2.at[state, action] =\
-                        Q2.at[state, action] + self.alpha *\
-                            (reward + self.gamma * Q1.at[next_state, best_action] - Q2.at[state, action])
+                    best_action = int(Q2[next_state].argmax())
+                    Q2[state, action] += self.alpha *\
+                        (reward + self.gamma * Q1[next_state, best_action] - Q2[state, action])
                     '''
 
                 state = next_state
@@ -402,7 +493,7 @@ class DoubleQLearning(TemporalDifferenceFunctions):
                 num_of_steps += 1
             self.logger.debug(f'num of steps: {num_of_steps}')
         # After all epochs are done, plot the results
-        self.drew_policy((Q1 + Q2), plot_name=plot_name)
+        self.drew_policy(self.q_to_df(Q1 + Q2), plot_name=plot_name)
 
 
 class TabularDynaQ(TemporalDifferenceFunctions): #TODO
@@ -416,10 +507,10 @@ class TabularDynaQ(TemporalDifferenceFunctions): #TODO
     def __init__(
         self, env, alpha:float = 0.5, gamma:float = 0.9,  starting_state=(2,0), 
         num_of_epochs:int = 1_000, num_episodes =10_000, epsilon = 0.1,
-        plot_name='TabularDynaQ', reward = -1):
+        plot_name='TabularDynaQ', reward = -1, seed:int = None):
         """
         """
-        super().__init__()
+        super().__init__(seed)
         self.num_of_epochs = num_of_epochs
         self.gamma = gamma
         self.alpha = alpha
@@ -434,6 +525,7 @@ class TabularDynaQ(TemporalDifferenceFunctions): #TODO
     def compute_state_value(self, plot_name='TabularDynaQ'):
         self.logger.info('Compute Tabular Dyna-Q')
         # self.td_control(algo = self.q_learning_formula, plot_name=plot_name)
+        self._build_tables()
         # Initialize Q(s,a)
         Q = self.get_q_df()
 
@@ -443,13 +535,13 @@ class TabularDynaQ(TemporalDifferenceFunctions): #TODO
                 self.logger.info(f'\tEpoch {epoch}')
 
             # Get first state and action for the episode
-            state = random.choice(self.env.available_states) if self.starting_state is None else self.starting_state
-            action = self.select_action(state, Q)
+            state = self.get_start_state()
+            action = self.select_action(Q[state])
 
             # Loop for each step of the episode:
             num_of_steps = 0
-            while not self.env.is_terminal_state(state) and num_of_steps < self.num_episodes:
+            while not self._term[state] and num_of_steps < self.num_episodes:
                 # Generate trajectory
-                next_state = self.env.next_state_given_action(state, action)
-                next_action = self.select_action(next_state, Q)
-                reward = self.env.grid[next_state]
\ No newline at end of file
+                next_state = self._T[state, action]
+                next_action = self.select_action(Q[next_state])
+                reward = self._R[next_state]
\ No newline at end of file
@@ -10,14 +10,69 @@ from typing import List, Tuple
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm 
 from icecream import ic
+from joblib import Parallel, delayed
 from plotnine import *
 
 # Local imports
 from ..logs import logging
-from .tool_box import create_directory
+from .tool_box import create_directory, njit
 import sys
 
 
+@njit(cache=True)
+def _greedy_rollout(
+    R, explore, random_arms, tie_breaks, q_estimation, action_count, best_arm, 
+    sample_averages, step_size):
+    '''
+    Epsilon greedy over pre-sampled rewards R (time x arms), updating q_estimation and action_count in place.
+    Returns the rewards obtained and the percentage of time the best arm was taken
+    '''
+    time, arms = R.shape
+    rewards = np.empty(time)
+    best_action_percentage = np.empty(time)
+    best_action_count = 0
+    for num in range(time):
+        action = 0
+        if explore[num]:
+            action = random_arms[num]
+        else:
+            # Greedy action, breaking ties with tie_breaks
+            q_max = q_estimation.max()
+            num_ties = 0
+            for arm in range(arms):
+                if q_estimation[arm] == q_max:
+                    num_ties += 1
+            tie = int(tie_breaks[num] * num_ties)
+            for arm in range(arms):
+                if q_estimation[arm] == q_max:
+                    if tie == 0:
+                        action = arm
+                        break
+                    tie -= 1
+
+        reward = R[num, action]
+        action_count[action] += 1
+        if sample_averages:
+            # Q[action] = Q[action] + (reward - Q[action])/N[action]
+            q_estimation[action] += (reward - q_estimation[action]) / action_count[action]
+        else:
+            # Q[action] = Q[action] + step_size*(reward - Q[action])
+            q_estimation[action] += step_size * (reward - q_estimation[action])
+
+        rewards[num] = reward
+        if action == best_arm:
+            best_action_count += 1
+        best_action_percentage[num] = best_action_count/(num+1)
+    return rewards, best_action_percentage
+
+
+def _one_run(bandits_cls, algo, seed:int, time:int, number_of_arms:int, images_dir:str, algo_kwargs:dict) -> np.ndarray:
+    '''Simulates algo on a new bandits problem, returns the percentage of time the best action was taken'''
+    bandits = bandits_cls(number_of_arms = number_of_arms, images_dir = images_dir, seed = seed)
+    _, best_action_percentage = algo(bandits, **algo_kwargs).simulate(time = time)
+    return best_action_percentage
+
+
 class CompareAllBanditsAlgos(object):
     """
     Class for the testing of all MAB algorithms
@@ -100,36 +155,67 @@ class Bandits():
         number_of_arms:int = 10,
         q_mean:List[float] = None,
         q_sd:List[float] = None, initial:float=.0,
-        bandit_name:List[str]=None, images_dir:str = 'images') -> None:
+        bandit_name:List[str]=None, images_dir:str = 'images', seed:int=None) -> None:
         self.logger = logging.getLogger(__name__)
         self.logger.info("Initialize Bandits")
+        # Random number generator shared by the bandits and the algorithms playing them
+        self.rng = np.random.default_rng(seed)
 
         self.number_of_arms = number_of_arms
         self.bandit_name = list(string.ascii_uppercase[:self.number_of_arms]) if bandit_name is None else bandit_name
 
+        self.name_to_idx = {name: idx for idx, name in enumerate(self.bandit_name)}
+
         # real reward for each action
-        self.q_mean = np.random.randn(self.number_of_arms) if q_mean is None else q_mean
-        self.q_sd = [1] * self.number_of_arms if q_sd is None else q_sd
+        self.q_mean = np.asarray(self.rng.standard_normal(self.number_of_arms) if q_mean is None else q_mean, dtype=float)
+        self.q_sd = np.asarray([1] * self.number_of_arms if q_sd is None else q_sd, dtype=float) # real sd for each action
+        self.best_arm = int(np.argmax(self.q_mean)) # index of the arm with the highest mean
         self.initial = initial
-        self.bandit_df = pd.DataFrame(
-            {'target': self.q_mean,
-            'true_sd': self.q_sd, # real sd for each action
-            'action_count': .0, # number of times action was taken
-            'q_estimation': .0 + self.initial, # Mean of rewards after each action
-            'estimated_sd': self.q_sd, # Standard deviation of rewards after each action
-            },
-            index=self.bandit_name).T
+        self.action_count = np.zeros(self.number_of_arms) # number of times action was taken
+        self.q_estimation = np.full(self.number_of_arms, .0 + self.initial) # Mean of rewards after each action
+        self.estimated_sd = self.q_sd.copy() # Standard deviation of rewards after each action
+
+        # Rows of bandit_df and the arrays they are built from
+        self.df_rows = {
+            'target': 'q_mean',
+            'true_sd': 'q_sd',
+            'action_count': 'action_count',
+            'q_estimation': 'q_estimation',
+            'estimated_sd': 'estimated_sd',
+            }
         self.images_dir = images_dir
         create_directory(directory_path = self.images_dir)
 
+    @property
+    def bandit_df(self) -> pd.DataFrame:
+        '''
+        The arms (columns) and their values (rows), built from the arrays. Only meant for plotting and reporting
+        '''
+        return pd.DataFrame(
+            {row: getattr(self, attr) for row, attr in self.df_rows.items()},
+            index=self.bandit_name).T
+
     def reset_bandit_df(self):
-        self.bandit_df.loc['action_count', :] = .0
-        self.bandit_df.loc['q_estimation', :] = .0 + self.initial
+        self.action_count.fill(.0)
+        self.q_estimation.fill(.0 + self.initial)
+
+    @classmethod
+    def run_experiments(
+        cls, algo, n_runs:int, time:int, number_of_arms:int = 10, 
+        n_jobs:int = -1, images_dir:str = 'images', **algo_kwargs) -> np.ndarray:
+        '''
+        Simulates algo on n_runs independent bandits problems (seeded 0 to n_runs-1), in parallel across n_jobs processes.
+        Returns the percentage of time the best action was taken at each time step, averaged over the runs
+        '''
+        runs = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_one_run)(cls, algo, seed, time, number_of_arms, images_dir, algo_kwargs) 
+            for seed in range(n_runs))
+        return np.mean(np.stack(runs), axis=0)
 
     def plot_bandits(self):
-        df = pd.DataFrame(
-            {name:np.random.normal(mu, sigma, size=1_000) 
-            for name, mu, sigma in zip(self.bandit_name, self.q_mean, self.q_sd)})
+        # One (samples x arms) draw, each column from its own bandit's distribution
+        samples = self.rng.normal(self.q_mean, self.q_sd, size=(1_000, self.number_of_arms))
+        df = pd.DataFrame(samples, columns=self.bandit_name)
         df = pd.melt(df, value_vars=self.bandit_name, value_name='value')
 
         g = (
@@ -148,8 +234,9 @@ class Bandits():
         '''
         Scatter plot of true mean vs estimation
         '''
+        df = self.bandit_df.T
         g = (
-            ggplot(self.bandit_df.T, aes(x='target', y=y_axis, color=self.bandit_df.columns), 
+            ggplot(df, aes(x='target', y=y_axis, color=df.index), 
             )
             + geom_point()
             + labs(x='Target (True Mean)', y='Estimated Mean', color='Bandits')
@@ -158,7 +245,7 @@ class Bandits():
             aes(x = min(self.q_mean), xend = max(self.q_mean),
                 y = min(self.q_mean), yend = max(self.q_mean),
                 ), color = 'black', linetype='dashed', alpha=.5
-        ) + geom_text(self.bandit_df.T, aes(x='target', y=y_axis, label=self.bandit_df.columns),
+        ) + geom_text(df, aes(x='target', y=y_axis, label=df.index),
             ha='left', nudge_x=0.05, color='black'
         )
         g.save(Path(self.images_dir, f'{pic_name}.png'), dpi=300)
@@ -166,19 +253,22 @@ class Bandits():
 class BernoulliBandits(Bandits):
     def __init__(
         self, number_of_arms: int = 10, q_mean: List[float] = None, q_sd: List[float] = None, 
-        initial: float = 1, bandit_name: List[str] = None, images_dir: str = 'images') -> None:
+        initial: float = 1, bandit_name: List[str] = None, images_dir: str = 'images', seed:int=None) -> None:
         ''''''
         self.logger = logging.getLogger(__name__)
         self.logger.info("Initialize Bernoulli Bandits")
         q_mean = np.linspace(0.1, 0.9, num=number_of_arms) if q_mean is None else q_mean
-        super().__init__(number_of_arms, q_mean, q_sd, initial, bandit_name, images_dir)
-        self.bandit_df.index = [
-            'target', # Our posterior
-            'theta_hat', # Updated posterior
-            'action_count', 
-            'alpha', # Sucesses
-            'beta' # Failures
-            ]
+        super().__init__(number_of_arms, q_mean, q_sd, initial, bandit_name, images_dir, seed)
+        self.theta_hat = np.zeros(self.number_of_arms) # Updated posterior
+        self.alpha = np.full(self.number_of_arms, .0 + self.initial) # Sucesses
+        self.beta = self.q_sd.copy() # Failures
+        self.df_rows = {
+            'target': 'q_mean', # Our posterior
+            'theta_hat': 'theta_hat',
+            'action_count': 'action_count',
+            'alpha': 'alpha',
+            'beta': 'beta',
+            }
 
 
 class MABFunctions(object):
@@ -188,48 +278,42 @@ class MABFunctions(object):
     def __init__(self) -> None:
         self.logger = logging.getLogger(__name__)
 
-    def _step(self, action) -> float:
+    def _step(self, action:int) -> float:
         """
-        This function returns the reward for the action taken
+        This function returns the reward for the action taken (index of the arm)
         """
-        assert action in self.bandits.bandit_name, f"{action} is not a valid action"
+        assert 0 <= action < self.bandits.number_of_arms, f"{action} is not a valid action"
 
-        reward = np.random.normal(
-            self.bandits.bandit_df[action]['target'], 
-            self.bandits.bandit_df[action]['true_sd'], size=1)[0]
-        self.logger.debug(f"Action {action} reward: {reward}")
-        self.bandits.bandit_df[action]['action_count'] += 1
+        reward = self.bandits.rng.normal(self.bandits.q_mean[action], self.bandits.q_sd[action])
+        self.logger.debug(f"Action {self.bandits.bandit_name[action]} reward: {reward}")
+        self.bandits.action_count[action] += 1
 
         if self.sample_averages:
             self.logger.debug("Sample averages")
             # Q[action] = Q[action] + (reward - Q[action])/N[action]
-            self.bandits.bandit_df[action]['q_estimation'] =\
-                self.bandits.bandit_df[action]['q_estimation']+\
-                (reward - self.bandits.bandit_df[action]['q_estimation'])/\
-                    self.bandits.bandit_df[action]['action_count']
+            self.bandits.q_estimation[action] +=\
+                (reward - self.bandits.q_estimation[action]) / self.bandits.action_count[action]
         elif self.step_size is not None:
             self.logger.debug(f"Step size {self.step_size }")
             # Q[action] = Q[action] + step_size*(reward - Q[action])
-            self.bandits.bandit_df[action]['q_estimation'] =\
-                self.bandits.bandit_df[action]['q_estimation'] +\
-                    self.step_size *\
-                         (reward - self.bandits.bandit_df[action]['q_estimation'])
+            self.bandits.q_estimation[action] +=\
+                self.step_size * (reward - self.bandits.q_estimation[action])
         return reward
 
-    def simulate(self, time:int) -> Tuple[List[float], List[float]]:
+    def simulate(self, time:int) -> Tuple[List[float], np.ndarray]:
         """
         This function simulates the action taking process.
         """
-        best_action = self.bandits.return_bandit_df().loc['target', :].idxmax()
+        best_action = self.bandits.best_arm
         best_action_count = 0
-        best_action_percentage = []
+        best_action_percentage = np.empty(time)
         for num in range(time):
             self.logger.debug(f"Time: {num}")
             action = self._act(num)
             self.tot_return.append(self._step(action))
             if action == best_action:
                 best_action_count += 1
-            best_action_percentage.append(best_action_count/(num+1))
+            best_action_percentage[num] = best_action_count/(num+1)
         self.best_action_percentage = best_action_percentage
         return self.tot_return, self.best_action_percentage
 
@@ -245,11 +329,11 @@ class OnlyExploration(MABFunctions):
         self.step_size = step_size
         self.logger.info("Initialize OnlyExploration")
 
-    def _act(self, _:int) -> str:
+    def _act(self, _:int) -> int:
         """
         This function returns a random action 
         """
-        return np.random.choice(self.bandits.bandit_name)
+        return int(self.bandits.rng.integers(self.bandits.number_of_arms))
 
 
 class OnlyExploitation(MABFunctions):
@@ -263,11 +347,11 @@ class OnlyExploitation(MABFunctions):
         self.sample_averages = sample_averages
         self.step_size = step_size
 
-    def _act(self, _:int) -> str:
+    def _act(self, _:int) -> int:
         """
         This function returns the known a priori best action
         """
-        return self.bandits.return_bandit_df().loc['target', :].idxmax()
+        return self.bandits.best_arm
 
 
 class Greedy(MABFunctions):
@@ -301,15 +385,32 @@ class Greedy(MABFunctions):
         self.step_size = step_size
         self.tot_return = []
 
-    def _act(self, _:int) -> str:
+    def _act(self, _:int) -> int:
         """
         This function returns the action to be taken based on the epsilon greedy policy.
         """
-        if np.random.rand() < self.epsilon:
-            return np.random.choice(self.bandits.bandit_name)
-        return np.random.choice(
-                self.bandits.bandit_df.loc['q_estimation', :][self.bandits.bandit_df.loc['q_estimation', :] ==\
-                    self.bandits.bandit_df.loc['q_estimation', :].max()].index)
+        if self.bandits.rng.random() < self.epsilon:
+            return int(self.bandits.rng.integers(self.bandits.number_of_arms))
+        q_estimation = self.bandits.q_estimation
+        return int(self.bandits.rng.choice(np.flatnonzero(q_estimation == q_estimation.max())))
+
+    def simulate_batched(self, time:int) -> Tuple[List[float], np.ndarray]:
+        """
+        Same as simulate, but the rewards and random draws of all the time steps
+        are sampled up front and the steps run in a jitted loop.
+        """
+        arms = self.bandits.number_of_arms
+        R = self.bandits.rng.normal(self.bandits.q_mean, self.bandits.q_sd, size=(time, arms))
+        explore = self.bandits.rng.random(time) < self.epsilon
+        random_arms = self.bandits.rng.integers(arms, size=time)
+        tie_breaks = self.bandits.rng.random(time)
+
+        rewards, self.best_action_percentage = _greedy_rollout(
+            R, explore, random_arms, tie_breaks, 
+            self.bandits.q_estimation, self.bandits.action_count, self.bandits.best_arm,
+            self.sample_averages, .0 if self.step_size is None else self.step_size)
+        self.tot_return.extend(rewards.tolist())
+        return self.tot_return, self.best_action_percentage
 
 
 class UCB(MABFunctions):
@@ -330,18 +431,29 @@ class UCB(MABFunctions):
         self.sample_averages = sample_averages
         self.step_size = step_size
         self.tot_return = []
+        self._ucb = np.empty(self.bandits.number_of_arms)
 
-    def _act(self, num:int) -> pd.DataFrame: 
+    def simulate(self, time:int) -> Tuple[List[float], np.ndarray]:
+        # log(t + 1) of every time step, so it is not recomputed by _act
+        self._log_table = np.log(np.arange(1, time + 1))
+        return super().simulate(time)
+
+    def _act(self, num:int) -> int: 
         # It does a first exploration of all options before using UCB 
-        if num < len(self.bandits.bandit_name):
-            return self.bandits.bandit_name[num]
-        
-        # action = np.argmax(Q + c * np.sqrt(np.log(e)/N))
-        UCB_estimation = self.bandits.bandit_df.loc['q_estimation', :] + \
-            self.UCB_param * np.sqrt(
-                np.log(num + 1) / (self.bandits.bandit_df.loc['action_count', :]))
+        if num < self.bandits.number_of_arms:
+            return num
         
-        return self.bandits.bandit_df.columns[np.random.choice(np.where(UCB_estimation == np.max(UCB_estimation))[0])]
+        # action = np.argmax(Q + c * np.sqrt(np.log(e)/N)), computed in place
+        UCB_estimation = self._ucb
+        np.add(self.bandits.action_count, 1e-5, out=UCB_estimation)
+        np.divide(self._log_table[num], UCB_estimation, out=UCB_estimation)
+        np.sqrt(UCB_estimation, out=UCB_estimation)
+        UCB_estimation *= self.UCB_param
+        UCB_estimation += self.bandits.q_estimation
+
+        action = int(np.argmax(UCB_estimation))
+        ties = np.flatnonzero(UCB_estimation == UCB_estimation[action])
+        return action if len(ties) == 1 else int(self.bandits.rng.choice(ties))
 
 
 class GBA(MABFunctions): 
@@ -364,27 +476,33 @@ class GBA(MABFunctions):
         self.tot_return = []
         self.decay_ratio = decay_ratio
         self.init_temp = min(init_temp, sys.float_info.max)
-        self.min_temp = max(min_temp, np.nextafter(np.float32(0), np.float32(1)))
+        self.min_temp = float(max(min_temp, np.nextafter(np.float32(0), np.float32(1))))
+        self._pbuf = np.empty(self.bandits.number_of_arms)
         self.logger.debug(f'Lin SoftMax {init_temp}, {min_temp}, {decay_ratio}')
 
-    def _act(self, num:int) -> str:
+    def _act(self, num:int) -> int:
         """
         This function returns the action to be taken based on the epsilon greedy policy.
         """
         decay_episodes = num+1 * self.decay_ratio
-        temp = 1 - np.exp(1) / decay_episodes
+        temp = 1 - np.e / decay_episodes
 
         temp *= self.init_temp - self.min_temp
         temp += self.min_temp
         temp = np.clip(temp, self.min_temp, self.init_temp)
 
-        Q = np.random.normal(self.bandits.bandit_df.loc['q_estimation', :], self.bandits.bandit_df.loc['estimated_sd', :])
-        scaled_Q = Q / temp
-        norm_Q = scaled_Q - np.max(scaled_Q)
-        exp_Q = np.exp(norm_Q)
-        probs = exp_Q / np.sum(exp_Q)
+        # Sample Q ~ N(q_estimation, estimated_sd) and take its softmax at temp, in place
+        probs = self._pbuf
+        self.bandits.rng.standard_normal(out=probs)
+        probs *= self.bandits.estimated_sd
+        probs += self.bandits.q_estimation
+        probs /= temp
+        probs -= probs.max()
+        np.exp(probs, out=probs)
+        probs /= probs.sum()
+        self.action_prob = probs
 
-        return np.random.choice(self.bandits.bandit_name, p=probs)
+        return int(self.bandits.rng.choice(self.bandits.number_of_arms, p=probs))
 
 
 class BernoulliThompsonSampling(MABFunctions):
@@ -449,36 +567,33 @@ class BernoulliThompsonSampling(MABFunctions):
         """
         self.logger.debug(action)
         # Compute Bernoulli distribution
-        reward = np.random.binomial(1, self.bandits.bandit_df[action]['target'], size=1)[0]
+        reward = self.bandits.rng.binomial(1, self.bandits.q_mean[action])
         self.logger.debug(reward)
 
-        self.bandits.bandit_df[action]['action_count'] += 1
-        self.bandits.bandit_df[action]['alpha'] += reward
-        self.bandits.bandit_df[action]['beta'] += 1-reward
+        self.bandits.action_count[action] += 1
+        self.bandits.alpha[action] += reward
+        self.bandits.beta[action] += 1-reward
 
-        assert np.isclose(np.sum(self.bandits.bandit_df.loc['target', :]), 1.0), \
-        f"The sum of all probabilities is not 1.0 ({np.sum(self.bandits.bandit_df.loc['target', :])})"
+        assert np.isclose(np.sum(self.bandits.q_mean), 1.0), \
+        f"The sum of all probabilities is not 1.0 ({np.sum(self.bandits.q_mean)})"
         return reward
 
-    def _act(self, _:int) -> str:        
+    def _act(self, _:int) -> int:        
         if self.bandit_type == 'BernTS':
             # Compute Bernoulli distributions
-            self.bandits.bandit_df.loc['theta_hat', :] = \
-                np.random.beta(a=self.bandits.bandit_df.loc['alpha', :], b=self.bandits.bandit_df.loc['beta', :])
-            self.logger.debug(self.bandits.bandit_df.loc['theta_hat', :])
+            self.bandits.theta_hat[:] = self.bandits.rng.beta(a=self.bandits.alpha, b=self.bandits.beta)
+            self.logger.debug(self.bandits.theta_hat)
 
         elif self.bandit_type == 'BernGreedy':
             # Compute Bernoulli distributions
-            self.bandits.bandit_df.loc['theta_hat', :] = \
-                self.bandits.bandit_df.loc['alpha', :]/(self.bandits.bandit_df.loc['alpha', :]+self.bandits.bandit_df.loc['beta', :])
-            self.logger.debug(self.bandits.bandit_df.loc['theta_hat', :])
+            self.bandits.theta_hat[:] = self.bandits.alpha/(self.bandits.alpha+self.bandits.beta)
+            self.logger.debug(self.bandits.theta_hat)
         else:
             raise ValueError(f'bandits type {self.bandit_type} not supported')
 
         # select action
-        return np.random.choice(
-            self.bandits.bandit_df.loc['theta_hat', :][self.bandits.bandit_df.loc['theta_hat', :] ==\
-                self.bandits.bandit_df.loc['theta_hat', :].max()].index)
+        theta_hat = self.bandits.theta_hat
+        return int(self.bandits.rng.choice(np.flatnonzero(theta_hat == theta_hat.max())))
 
 
 class GaussianThompsonSampling(MABFunctions):
@@ -500,12 +615,13 @@ class GaussianThompsonSampling(MABFunctions):
         self.logger.info("Initialize GaussianThompsonSampling")
         self.bandits = bandits
         self.tot_return = []
-        self.bandits.bandit_df.loc['theta_hat', :] = 0
-        self.bandits.bandit_df.loc['reward', :] = 0
-        self.estimated_sd = [estimated_sd]*self.bandits.bandit_df.shape[1] # prior_sigma
-        self.bandits.bandit_df.loc['estimated_sd', :] = self.estimated_sd  # post_sigma
-        self.q_estimation = [q_estimation]*self.bandits.bandit_df.shape[1] # prior_sigma
-        self.bandits.bandit_df.loc['q_estimation', :] = self.q_estimation  # post_sigma
+        self.bandits.theta_hat = np.zeros(self.bandits.number_of_arms)
+        self.bandits.reward = np.zeros(self.bandits.number_of_arms)
+        self.bandits.df_rows.update(theta_hat='theta_hat', reward='reward')
+        self.estimated_sd = np.full(self.bandits.number_of_arms, float(estimated_sd)) # prior_sigma
+        self.bandits.estimated_sd[:] = self.estimated_sd  # post_sigma
+        self.q_estimation = np.full(self.bandits.number_of_arms, float(q_estimation)) # prior_mu
+        self.bandits.q_estimation[:] = self.q_estimation  # post_mu
 
 
     def _step(self, action) -> None:
@@ -515,32 +631,28 @@ class GaussianThompsonSampling(MABFunctions):
         self.logger.debug(action)
         
         # Compute Bernoulli distribution
-        reward = np.random.normal(
-            self.bandits.bandit_df[action]['target'], 
-            self.bandits.bandit_df[action]['true_sd'], size=1)[0]
+        reward = self.bandits.rng.normal(self.bandits.q_mean[action], self.bandits.q_sd[action])
         self.logger.debug(reward)
 
-        self.bandits.bandit_df[action]['reward'] += reward
-        self.bandits.bandit_df[action]['action_count'] += 1
+        self.bandits.reward[action] += reward
+        self.bandits.action_count[action] += 1
         
         # Normalwith known variance σ**2
-        self.bandits.bandit_df.loc['estimated_sd', :] =\
+        self.bandits.estimated_sd[:] =\
              np.sqrt((
-                 1 / np.array(self.estimated_sd)**2 +\
-                 self.bandits.bandit_df.loc['action_count', :] / self.bandits.bandit_df.loc['true_sd', :]**2)**-1)
+                 1 / self.estimated_sd**2 +\
+                 self.bandits.action_count / self.bandits.q_sd**2)**-1)
        
-        self.bandits.bandit_df.loc['q_estimation', :] =\
-             (self.bandits.bandit_df.loc['estimated_sd', :]**2)*((np.array(self.q_estimation)/ np.array(self.estimated_sd)**2) +\
-                 (self.bandits.bandit_df.loc['reward', :]/self.bandits.bandit_df.loc['true_sd', :]**2))
+        self.bandits.q_estimation[:] =\
+             (self.bandits.estimated_sd**2)*((self.q_estimation / self.estimated_sd**2) +\
+                 (self.bandits.reward / self.bandits.q_sd**2))
         return reward
 
-    def _act(self, _:int) -> str:        
+    def _act(self, _:int) -> int:        
         # Compute value from estimated distribution 
-        self.bandits.bandit_df.loc['theta_hat', :] = \
-            np.random.normal(self.bandits.bandit_df.loc['q_estimation', :], self.bandits.bandit_df.loc['estimated_sd', :])
-        self.logger.debug(self.bandits.bandit_df.loc['theta_hat', :])
+        self.bandits.theta_hat[:] = self.bandits.rng.normal(self.bandits.q_estimation, self.bandits.estimated_sd)
+        self.logger.debug(self.bandits.theta_hat)
 
         # select action
-        return( np.random.choice(
-            self.bandits.bandit_df.loc['action_count', :][self.bandits.bandit_df.loc['theta_hat', :] ==\
-                self.bandits.bandit_df.loc['theta_hat', :].max()].index) )
\ No newline at end of file
+        theta_hat = self.bandits.theta_hat
+        return int(self.bandits.rng.choice(np.flatnonzero(theta_hat == theta_hat.max())))
\ No newline at end of file
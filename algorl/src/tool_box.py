@@ -3,8 +3,15 @@ from pathlib import Path
 
 # Third party libraries
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.table import Table
+
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the jitted functions run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # Local imports
 from ..logs import logging
@@ -50,6 +57,10 @@ class RLFunctions(object):
         ax.add_table(tb)
 
     def drew_policy(self, df, plot_name:str):
+        # Matplotlib is only imported once there is something to plot
+        import matplotlib.pyplot as plt
+        from matplotlib.table import Table
+
         df = df.idxmax(axis=1)
         self.logger.debug(df)
         arrow_symbols = {'U':'\u2191', 'D':'\u2193', 'L':'\u2190', 'R':'\u2192'}
@@ -1,10 +1,11 @@
 import os
 import pytest
+import numpy as np
 import pandas as pd
 from contextlib import contextmanager
 
 
-from algorl.src.bandit import Bandits #, RLFunctions
+from algorl.src.bandit import Bandits, BernoulliBandits, Greedy, _greedy_rollout #, RLFunctions
 
 os.chdir(os.path.dirname(__file__))
 
@@ -17,3 +18,67 @@ def test_bandits(setup_teardown):
     bandits = Bandits(number_of_arms = 5)
     assert bandits.number_of_arms == 5
     assert type(bandits.return_bandit_df()) == type(pd.DataFrame())
+
+def test_bernoulli_bandits_prior(setup_teardown):
+    bandits = BernoulliBandits(number_of_arms = 5, q_sd = [2] * 5, initial = 3)
+    assert (bandits.alpha == 3).all()
+    assert (bandits.beta == 2).all()
+    bandits.alpha[0] += 1
+    bandits.reset_bandit_df()
+    assert bandits.alpha[0] == 4
+
+def test_greedy_simulate(setup_teardown):
+    bandits = Bandits(number_of_arms = 5)
+    _, best_action_percentage = Greedy(bandits).simulate(time = 100)
+    assert len(best_action_percentage) == 100
+    assert bandits.action_count.sum() == 100
+    assert bandits.return_bandit_df().loc['action_count', :].sum() == 100
+
+def test_greedy_simulate_batched(setup_teardown):
+    bandits = Bandits(number_of_arms = 5)
+    rewards, best_action_percentage = Greedy(bandits, epsilon=.1).simulate_batched(time = 100)
+    assert len(rewards) == len(best_action_percentage) == 100
+    assert bandits.action_count.sum() == 100
+
+def test_greedy_simulate_batched_sample_averages(setup_teardown):
+    q_mean = [0.1, 0.5, 0.2, 0.9, 0.4]
+    bandits = Bandits(number_of_arms = 5, q_mean = q_mean, seed = 0)
+    rewards, _ = Greedy(bandits, epsilon=0).simulate_batched(time = 100)
+    # Replay the reward draws of the rollout to recover the arm taken at each step
+    twin = Bandits(number_of_arms = 5, q_mean = q_mean, seed = 0)
+    R = twin.rng.normal(twin.q_mean, twin.q_sd, size=(100, 5))
+    actions = np.array([np.flatnonzero(R[t] == reward)[0] for t, reward in enumerate(rewards)])
+    for arm in np.unique(actions):
+        assert bandits.action_count[arm] == (actions == arm).sum()
+        assert np.isclose(bandits.q_estimation[arm], R[actions == arm, arm].mean())
+
+def test_greedy_rollout_step_size(setup_teardown):
+    R = np.array([[1., 0.], [3., 0.], [5., 0.]])
+    q_estimation, action_count = np.zeros(2), np.zeros(2)
+    rewards, best_action_percentage = _greedy_rollout(
+        R, np.zeros(3, dtype=np.bool_), np.zeros(3, dtype=np.int64), np.zeros(3), 
+        q_estimation, action_count, 0, False, .5)
+    np.testing.assert_array_equal(rewards, [1., 3., 5.])
+    np.testing.assert_array_equal(best_action_percentage, [1., 1., 1.])
+    # q <- q + step_size * (r - q): 0 -> .5 -> 1.75 -> 3.375
+    assert q_estimation[0] == 3.375
+    assert action_count[0] == 3
+
+def test_bandits_seed(setup_teardown):
+    returns = []
+    for _ in range(2):
+        bandits = Bandits(number_of_arms = 5, seed = 42)
+        reward, _ = Greedy(bandits).simulate(time = 50)
+        returns.append(reward)
+    assert returns[0] == returns[1]
+
+def test_run_experiments(setup_teardown):
+    best_action_percentage = Bandits.run_experiments(Greedy, n_runs = 4, time = 50, number_of_arms = 5, n_jobs = 1)
+    assert best_action_percentage.shape == (50,)
+    assert ((best_action_percentage >= 0) & (best_action_percentage <= 1)).all()
+
+def test_run_experiments_n_jobs(setup_teardown):
+    # Each run is seeded by its index, so the average does not depend on how the runs are spread over processes
+    serial = Bandits.run_experiments(Greedy, n_runs = 4, time = 50, number_of_arms = 5, n_jobs = 1)
+    parallel = Bandits.run_experiments(Greedy, n_runs = 4, time = 50, number_of_arms = 5, n_jobs = 2)
+    np.testing.assert_array_equal(serial, parallel)
@@ -0,0 +1,67 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+
+from algorl.src.grid_environment import RussellNorvigGridworld
+from algorl.src.TD import TabularTD0, Sarsa, QLearning, NStepTD, _sarsa_update, _qlearn_update
+
+os.chdir(os.path.dirname(__file__))
+
+def test_get_q_df(setup_teardown):
+    env = RussellNorvigGridworld.gridword()
+    sarsa = Sarsa(env)
+    Q = sarsa.get_q_df()
+    assert Q.shape == (len(env.all_states), len(env.possible_actions))
+    assert not Q.any()
+    assert Q.dtype == np.float32
+    assert type(sarsa.q_to_df(Q)) == type(pd.DataFrame())
+
+def test_qlearn_update(setup_teardown):
+    Q = np.zeros((2, 4), dtype=np.float32)
+    Q[1] = [0, 2, 0, 0]
+    _qlearn_update(Q, 0, 3, -1.0, 1, 0.5, 0.9)
+    assert np.isclose(Q[0, 3], 0.5 * (-1 + 0.9 * 2))
+
+def test_sarsa_update(setup_teardown):
+    Q = np.zeros((2, 4), dtype=np.float32)
+    Q[1] = [0, 2, 1, 0]
+    # Sarsa bootstraps from the next action taken, not the greedy one
+    _sarsa_update(Q, 0, 3, -1.0, 1, 2, 0.5, 0.9)
+    assert np.isclose(Q[0, 3], 0.5 * (-1 + 0.9 * 1))
+
+def test_sarsa_seed(setup_teardown):
+    policies = []
+    for _ in range(2):
+        sarsa = Sarsa(RussellNorvigGridworld.gridword(), num_of_epochs=20, seed=42)
+        sarsa.drew_policy = lambda df, plot_name: policies.append(df)
+        sarsa.compute_state_value()
+    pd.testing.assert_frame_equal(policies[0], policies[1])
+
+def test_qlearning_seed(setup_teardown):
+    policies = []
+    for _ in range(2):
+        qlearn = QLearning(RussellNorvigGridworld.gridword(), num_of_epochs=20, seed=42)
+        qlearn.drew_policy = lambda df, plot_name: policies.append(df)
+        qlearn.compute_state_value()
+    pd.testing.assert_frame_equal(policies[0], policies[1])
+    assert policies[0].to_numpy().any()
+
+def test_td0_updates_grid(setup_teardown):
+    env = RussellNorvigGridworld.gridword()
+    grid = env.grid.copy()
+    TabularTD0(env, num_of_epochs=10, seed=0).compute_state_value()
+    assert not np.array_equal(env.grid, grid, equal_nan=True)
+
+def test_build_tables_grid_layout(setup_teardown):
+    env = RussellNorvigGridworld.gridword()
+    env.grid = np.asfortranarray(env.grid)
+    with pytest.raises(ValueError):
+        TabularTD0(env, num_of_epochs=1).compute_state_value()
+
+def test_n_step_discounted_return(setup_teardown):
+    nstep = NStepTD(RussellNorvigGridworld.gridword(), gamma=0.9, n_step=3)
+    rewards = [1, 2, 3, 4]
+    assert np.isclose(nstep.discounted_return(rewards, 1, 4), 2 + 0.9 * 3 + 0.9**2 * 4)
+    # The last steps of an episode have fewer than n rewards left
+    assert np.isclose(nstep.discounted_return(rewards, 2, 4), 3 + 0.9 * 4)